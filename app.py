@@ -1,57 +1,223 @@
 import streamlit as st
-import datetime
-import uuid
-from dataclasses import dataclass
+import functools
+import html
+import time
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is an optional accelerator
+    njit = None
+
+_PAGE_CONFIG = dict(
+    page_title="Professional Chat Platform",
+    page_icon="💬",
+    layout="wide",
+    initial_sidebar_state="expanded",
+)
+
+# Must be the first st.* call; a no-op guard keeps repeat executions cheap
+try:
+    st.set_page_config(**_PAGE_CONFIG)
+except st.errors.StreamlitAPIException:
+    pass
+
+# How many users the sidebar renders before collapsing the rest
+SIDEBAR_USER_LIMIT = 25
+
+GENDER_OPTIONS = ("Select Gender", "Male", "Female", "Other")
+
 # Data Models
-@dataclass
+@dataclass(slots=True)
 class User:
-    id: str
+    id: int
     name: str
     age: int
     gender: str
     online: bool = True
-    last_active: datetime.datetime = datetime.datetime.now()
-
-@dataclass
-class Message:
-    id: str
-    sender_id: str
-    receiver_id: str
-    content: str
-    timestamp: datetime.datetime
-    is_read: bool = False
-
-@dataclass
+    last_active: int = field(default_factory=time.time_ns)
+
+class MessageStore:
+    """Columnar (structure-of-arrays) store for all messages in a session.
+
+    Fixed-width fields live in parallel NumPy arrays so bulk filters run
+    as vectorized masks in C instead of chasing a Python object per
+    message; variable-length content stays in a plain list. Arrays grow
+    by doubling, so appends are amortized O(1)."""
+
+    __slots__ = ('_capacity', 'size', 'sender_id', 'receiver_id',
+                 'is_read', 'ts_ns', 'content', 'display_ts')
+
+    _INITIAL_CAPACITY = 64
+
+    def __init__(self):
+        self._capacity = self._INITIAL_CAPACITY
+        self.size = 0
+        self.sender_id = np.empty(self._capacity, dtype=np.int64)
+        self.receiver_id = np.empty(self._capacity, dtype=np.int64)
+        self.is_read = np.zeros(self._capacity, dtype=bool)
+        self.ts_ns = np.empty(self._capacity, dtype=np.int64)
+        self.content = []  # List[str]
+        self.display_ts = []  # List[str], formatted once at append time
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        self._capacity *= 2
+        for column in ('sender_id', 'receiver_id', 'is_read', 'ts_ns'):
+            old = getattr(self, column)
+            new = np.empty(self._capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, column, new)
+
+    def append(self, sender_id: int, receiver_id: int, content: str) -> int:
+        """Append a message and return its row index."""
+        if self.size == self._capacity:
+            self._grow()
+        row = self.size
+        self.sender_id[row] = sender_id
+        self.receiver_id[row] = receiver_id
+        self.is_read[row] = False
+        ts_ns = time.time_ns()
+        self.ts_ns[row] = ts_ns
+        self.content.append(content)
+        local = time.localtime(ts_ns // 1_000_000_000)
+        self.display_ts.append(f"{local.tm_hour:02d}:{local.tm_min:02d}:{local.tm_sec:02d}")
+        self.size = row + 1
+        return row
+
+@dataclass(slots=True)
 class Group:
-    id: str
+    id: int
     name: str
-    creator_id: str
-    members: List[str]
-    created_at: datetime.datetime
+    creator_id: int
+    members: List[int]
+    created_at: int
+
+# (key, factory) table for session-state defaults, applied in one pass
+_SESSION_DEFAULTS = (
+    ('users', dict),            # Dict[int, User]
+    ('current_user', lambda: None),
+    ('messages', MessageStore),
+    # Keyed by frozenset({sender_id, receiver_id}) for DMs, group_id for
+    # groups; values are MessageStore row indices in append order
+    ('conv_rows', dict),
+    ('groups', dict),           # Dict[int, Group]
+    ('active_chats', set),      # Set of ("user"|"group", id) tuples
+    # int64 counters indexed by user id (ids are small sequential ints)
+    ('unread_counts', lambda: np.zeros(0, dtype=np.int64)),
+    # Dict[group_id, np.ndarray]: pending counts aligned with group.members
+    ('group_unread', dict),
+    ('current_page', lambda: "login"),
+    ('users_version', int),     # Bumped whenever the user set changes
+    ('users_snapshot_key', lambda: None),
+    ('users_snapshot', tuple),
+    ('next_id', int),
+)
 
 def init_session_state():
     """Initialize session state variables"""
-    if 'users' not in st.session_state:
-        st.session_state.users = {}  # Dict[str, User]
-    if 'current_user' not in st.session_state:
-        st.session_state.current_user = None
-    if 'messages' not in st.session_state:
-        st.session_state.messages = []  # List[Message]
-    if 'groups' not in st.session_state:
-        st.session_state.groups = {}  # Dict[str, Group]
-    if 'active_chats' not in st.session_state:
-        st.session_state.active_chats = set()  # Set of open chat windows
-    if 'unread_counts' not in st.session_state:
-        st.session_state.unread_counts = {}  # Dict[str, int]
-    if 'current_page' not in st.session_state:
-        st.session_state.current_page = "login"
-
-def get_unread_messages_count(user_id: str) -> int:
+    for key, factory in _SESSION_DEFAULTS:
+        if key not in st.session_state:
+            st.session_state[key] = factory()
+
+def _next_id() -> int:
+    """Allocate a session-unique integer id (users and groups share the counter).
+
+    hash(int) is the identity, so these are far cheaper dict keys and
+    comparison operands than 36-char uuid strings."""
+    next_id = st.session_state.next_id
+    st.session_state.next_id = next_id + 1
+    return next_id
+
+def _available_users_snapshot(version: int, current_id: int):
+    """Snapshot of (id, name, online) for every user except current_id,
+    online users first.
+
+    Memoized in session state keyed by (users_version, current_id), so
+    reruns reuse the cached tuples until the user set actually changes.
+    st.cache_data would be wrong here: it is process-global while both
+    key counters are per-session, so concurrent sessions would alias
+    each other's entries."""
+    key = (version, current_id)
+    if st.session_state.users_snapshot_key != key:
+        rows = [(user_id, user.name, user.online)
+                for user_id, user in st.session_state.users.items()
+                if user_id != current_id]
+        rows.sort(key=lambda row: not row[2])
+        st.session_state.users_snapshot = tuple(rows)
+        st.session_state.users_snapshot_key = key
+    return st.session_state.users_snapshot
+
+def _unread_array() -> np.ndarray:
+    """Unread counters indexed by user id, grown to cover every allocated id."""
+    arr = st.session_state.unread_counts
+    needed = st.session_state.next_id
+    if needed > arr.shape[0]:
+        grown = np.zeros(max(needed, arr.shape[0] * 2, 16), dtype=np.int64)
+        grown[:arr.shape[0]] = arr
+        st.session_state.unread_counts = arr = grown
+    return arr
+
+def get_unread_messages_count(user_id: int) -> int:
     """Get count of unread messages for a user"""
-    return sum(1 for msg in st.session_state.messages 
-              if msg.receiver_id == user_id and not msg.is_read)
+    return int(_unread_array()[user_id])
+
+def _mark_read_fallback(rows, sender_id, is_read, other_id):
+    unread = rows[(sender_id[rows] == other_id) & ~is_read[rows]]
+    is_read[unread] = True
+    return int(unread.size)
+
+if njit is not None:
+    @njit(cache=True)
+    def _mark_read_kernel(rows, sender_id, is_read, other_id):
+        count = 0
+        for i in range(rows.shape[0]):
+            row = rows[i]
+            if not is_read[row] and sender_id[row] == other_id:
+                is_read[row] = True
+                count += 1
+        return count
+else:
+    _mark_read_kernel = _mark_read_fallback
+
+@functools.lru_cache(maxsize=1024)
+def _name_prefix(user_id: int, name: str) -> str:
+    """Escaped bold sender prefix, cached per user (names are immutable)"""
+    return f"**{html.escape(name)}**"
+
+def mark_read(user_id: int, other_id: int):
+    """Mark all messages sent by other_id to user_id as read"""
+    rows = st.session_state.conv_rows.get(frozenset({user_id, other_id}))
+    if not rows:
+        return
+    store = st.session_state.messages
+    idx = np.asarray(rows, dtype=np.int64)
+    read_count = _mark_read_kernel(idx, store.sender_id, store.is_read, other_id)
+    if read_count:
+        counts = _unread_array()
+        counts[user_id] = max(int(counts[user_id]) - read_count, 0)
+
+def mark_group_read(user_id: int, group_id: int):
+    """Clear the unread count user_id has accumulated for a group"""
+    pending = st.session_state.group_unread.get(group_id)
+    if pending is None:
+        return
+    members = st.session_state.groups[group_id].members
+    if user_id not in members:
+        # A stale chat window can outlive the viewer's membership (e.g. a
+        # fresh login reusing old active_chats); nothing pending for them
+        return
+    slot = members.index(user_id)
+    count = int(pending[slot])
+    if count:
+        pending[slot] = 0
+        counts = _unread_array()
+        counts[user_id] = max(int(counts[user_id]) - count, 0)
 
 def login_page():
     """Render the login page"""
@@ -63,12 +229,12 @@ def login_page():
             name = st.text_input("Full Name")
             age = st.number_input("Age", min_value=18, max_value=100, value=25)
         with col2:
-            gender = st.selectbox("Gender", ["Select Gender", "Male", "Female", "Other"])
+            gender = st.selectbox("Gender", GENDER_OPTIONS)
         
         submit = st.form_submit_button("Join Platform", use_container_width=True)
         
-        if submit and name and gender != "Select Gender":
-            user_id = str(uuid.uuid4())
+        if submit and name and gender != GENDER_OPTIONS[0]:
+            user_id = _next_id()
             new_user = User(
                 id=user_id,
                 name=name,
@@ -78,18 +244,20 @@ def login_page():
             st.session_state.users[user_id] = new_user
             st.session_state.current_user = new_user
             st.session_state.current_page = "main"
+            st.session_state.users_version += 1
             st.rerun()
 
-def render_chat_window(other_user_id: str):
+@st.fragment
+def render_chat_window(other_user_id: int):
     """Render a chat window for a specific user"""
-    other_user = st.session_state.users[other_user_id]
-    
+    users = st.session_state.users
+    current_user_id = st.session_state.current_user.id
+    other_user = users[other_user_id]
+
     # Get chat history
-    chat_messages = [
-        msg for msg in st.session_state.messages 
-        if (msg.sender_id in [st.session_state.current_user.id, other_user_id] and 
-            msg.receiver_id in [st.session_state.current_user.id, other_user_id])
-    ]
+    conv_key = frozenset({current_user_id, other_user_id})
+    chat_rows = st.session_state.conv_rows.get(conv_key, [])
+    store = st.session_state.messages
     
     # Chat container
     chat_container = st.container()
@@ -103,46 +271,45 @@ def render_chat_window(other_user_id: str):
             submit = st.form_submit_button("Send")
         
         if submit and message:
-            new_message = Message(
-                id=str(uuid.uuid4()),
-                sender_id=st.session_state.current_user.id,
-                receiver_id=other_user_id,
-                content=message,
-                timestamp=datetime.datetime.now()
-            )
-            st.session_state.messages.append(new_message)
-            st.rerun()
-    
-    # Display messages
+            row = store.append(current_user_id, other_user_id, message)
+            st.session_state.conv_rows.setdefault(conv_key, []).append(row)
+            _unread_array()[other_user_id] += 1
+            st.rerun(scope="fragment")
+
+    # Reading the window counts as reading the messages in it
+    mark_read(current_user_id, other_user_id)
+
+    # Display messages (rows are appended in timestamp order) as one
+    # markdown block instead of ~5 widgets per message
     with chat_container:
-        for msg in sorted(chat_messages, key=lambda x: x.timestamp):
-            is_current_user = msg.sender_id == st.session_state.current_user.id
-            sender = st.session_state.users[msg.sender_id]
-            
-            col1, col2 = st.columns([1, 4])
-            with col1:
-                st.write(f"**{sender.name}**")
-            with col2:
-                st.write(msg.content)
-            st.write(f"*{msg.timestamp.strftime('%H:%M:%S')}*")
-            st.markdown("---")
+        lines = []
+        for row in chat_rows:
+            sender_id = int(store.sender_id[row])
+            prefix = _name_prefix(sender_id, users[sender_id].name)
+            lines.append(
+                f"{prefix}: {html.escape(store.content[row])}  \n"
+                f"*{store.display_ts[row]}*\n\n---\n"
+            )
+        if lines:
+            st.markdown("".join(lines))
 
-def render_group_chat(group_id: str):
+@st.fragment
+def render_group_chat(group_id: int):
     """Render a group chat window"""
+    users = st.session_state.users
+    current_user_id = st.session_state.current_user.id
     group = st.session_state.groups[group_id]
     
     # Get group messages
-    group_messages = [
-        msg for msg in st.session_state.messages 
-        if msg.receiver_id == group_id
-    ]
+    group_rows = st.session_state.conv_rows.get(group_id, [])
+    store = st.session_state.messages
     
     st.subheader(f"📱 {group.name}")
     
     # Members list
     with st.expander("Group Members"):
         for member_id in group.members:
-            member = st.session_state.users[member_id]
+            member = users[member_id]
             st.write(f"{'🟢' if member.online else '⚫'} {member.name}")
     
     # Chat container
@@ -157,42 +324,58 @@ def render_group_chat(group_id: str):
             submit = st.form_submit_button("Send")
         
         if submit and message:
-            new_message = Message(
-                id=str(uuid.uuid4()),
-                sender_id=st.session_state.current_user.id,
-                receiver_id=group_id,
-                content=message,
-                timestamp=datetime.datetime.now()
-            )
-            st.session_state.messages.append(new_message)
-            st.rerun()
-    
-    # Display messages
+            row = store.append(current_user_id, group_id, message)
+            st.session_state.conv_rows.setdefault(group_id, []).append(row)
+            members = np.asarray(group.members, dtype=np.int64)
+            pending = st.session_state.group_unread.setdefault(
+                group_id, np.zeros(members.shape[0], dtype=np.int64))
+            others = members != current_user_id
+            np.add.at(_unread_array(), members[others], 1)
+            pending[others] += 1
+            st.rerun(scope="fragment")
+
+    # Reading the window counts as reading the messages in it
+    mark_group_read(current_user_id, group_id)
+
+    # Display messages (rows are appended in timestamp order) as one
+    # markdown block instead of ~5 widgets per message
     with chat_container:
-        for msg in sorted(group_messages, key=lambda x: x.timestamp):
-            sender = st.session_state.users[msg.sender_id]
-            
-            col1, col2 = st.columns([1, 4])
+        lines = []
+        for row in group_rows:
+            sender_id = int(store.sender_id[row])
+            prefix = _name_prefix(sender_id, users[sender_id].name)
+            lines.append(
+                f"{prefix}: {html.escape(store.content[row])}  \n"
+                f"*{store.display_ts[row]}*\n\n---\n"
+            )
+        if lines:
+            st.markdown("".join(lines))
+
+def _render_user_rows(rows):
+    """Render sidebar rows for a slice of the user snapshot"""
+    for user_id, name, online in rows:
+        if online:
+            col1, col2 = st.columns([3, 1])
             with col1:
-                st.write(f"**{sender.name}**")
+                st.write(f"🟢 {name}")
             with col2:
-                st.write(msg.content)
-            st.write(f"*{msg.timestamp.strftime('%H:%M:%S')}*")
-            st.markdown("---")
+                if st.button("Chat", key=f"chat_btn_{user_id}"):
+                    st.session_state.active_chats.add(("user", user_id))
 
 def main_page():
     """Render the main chat interface"""
+    users = st.session_state.users
+    current_user_id = st.session_state.current_user.id
+    available = _available_users_snapshot(st.session_state.users_version, current_user_id)
+
     # Sidebar with online users and groups
     with st.sidebar:
         st.title("👥 Online Users")
-        for user_id, user in st.session_state.users.items():
-            if user_id != st.session_state.current_user.id and user.online:
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.write(f"{'🟢' if user.online else '⚫'} {user.name}")
-                with col2:
-                    if st.button("Chat", key=f"chat_btn_{user_id}"):
-                        st.session_state.active_chats.add(user_id)
+        _render_user_rows(available[:SIDEBAR_USER_LIMIT])
+        if len(available) > SIDEBAR_USER_LIMIT:
+            # Collapsed expander children are not rendered until opened
+            with st.expander("More users"):
+                _render_user_rows(available[SIDEBAR_USER_LIMIT:])
         
         st.markdown("---")
         
@@ -200,28 +383,26 @@ def main_page():
         st.subheader("👥 Create New Group")
         with st.form("create_group_form"):
             group_name = st.text_input("Group Name")
-            available_users = [user for user_id, user in st.session_state.users.items() 
-                             if user_id != st.session_state.current_user.id]
+            name_to_id = {name: user_id for user_id, name, _ in available}
             selected_users = st.multiselect(
                 "Add Members",
-                options=[user.name for user in available_users],
+                options=list(name_to_id),
                 format_func=lambda x: x
             )
-            
+
             if st.form_submit_button("Create Group"):
                 if group_name and selected_users:
-                    group_id = str(uuid.uuid4())
-                    member_ids = [st.session_state.current_user.id]
-                    for user in available_users:
-                        if user.name in selected_users:
-                            member_ids.append(user.id)
-                    
+                    group_id = _next_id()
+                    selected_set = set(selected_users)
+                    member_ids = [current_user_id] + \
+                        [name_to_id[name] for name in selected_set if name in name_to_id]
+
                     new_group = Group(
                         id=group_id,
                         name=group_name,
-                        creator_id=st.session_state.current_user.id,
+                        creator_id=current_user_id,
                         members=member_ids,
-                        created_at=datetime.datetime.now()
+                        created_at=time.time_ns()
                     )
                     st.session_state.groups[group_id] = new_group
                     st.rerun()
@@ -231,9 +412,9 @@ def main_page():
             st.markdown("---")
             st.subheader("👥 Your Groups")
             for group_id, group in st.session_state.groups.items():
-                if st.session_state.current_user.id in group.members:
+                if current_user_id in group.members:
                     if st.button(f"📱 {group.name}", key=f"group_btn_{group_id}"):
-                        st.session_state.active_chats.add(f"group_{group_id}")
+                        st.session_state.active_chats.add(("group", group_id))
     
     # Main chat area
     col1, col2 = st.columns([3, 1])
@@ -241,27 +422,30 @@ def main_page():
         st.title(f"Welcome, {st.session_state.current_user.name}!")
         
         # Display unread message count
-        unread_count = get_unread_messages_count(st.session_state.current_user.id)
+        unread_count = get_unread_messages_count(current_user_id)
         if unread_count > 0:
             st.info(f"You have {unread_count} unread messages")
     
     with col2:
         if st.button("🚪 Logout"):
-            st.session_state.users[st.session_state.current_user.id].online = False
+            users[current_user_id].online = False
             st.session_state.current_user = None
             st.session_state.current_page = "login"
+            st.session_state.users_version += 1
             st.rerun()
     
     # Active chat windows
-    for chat_id in list(st.session_state.active_chats):
-        with st.expander(f"Chat with {st.session_state.users[chat_id].name if not chat_id.startswith('group_') else st.session_state.groups[chat_id[6:]].name}", expanded=True):
-            if chat_id.startswith('group_'):
-                render_group_chat(chat_id[6:])
+    for kind, chat_id in list(st.session_state.active_chats):
+        is_group = kind == "group"
+        title = st.session_state.groups[chat_id].name if is_group else users[chat_id].name
+        with st.expander(f"Chat with {title}", expanded=True):
+            if is_group:
+                render_group_chat(chat_id)
             else:
                 render_chat_window(chat_id)
-            
-            if st.button("Close Chat", key=f"close_{chat_id}"):
-                st.session_state.active_chats.remove(chat_id)
+
+            if st.button("Close Chat", key=f"close_{kind}_{chat_id}"):
+                st.session_state.active_chats.remove((kind, chat_id))
                 st.rerun()
 
 def main():
@@ -273,10 +457,4 @@ def main():
         main_page()
 
 if __name__ == "__main__":
-    st.set_page_config(
-        page_title="Professional Chat Platform",
-        page_icon="💬",
-        layout="wide",
-        initial_sidebar_state="expanded"
-    )
     main()